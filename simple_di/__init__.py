@@ -3,11 +3,17 @@ A simple dependency injection framework
 '''
 import functools
 import inspect
+import itertools
+import keyword
+import sys
+from types import FunctionType, MethodType
 from typing import (
     Any,
     Callable,
     Dict,
     Generic,
+    List,
+    NamedTuple,
     Optional,
     Tuple,
     TypeVar,
@@ -15,10 +21,21 @@ from typing import (
     cast,
     overload,
 )
+from weakref import WeakKeyDictionary
 
 
 class _SentinelClass:
-    pass
+    '''
+    The type of `sentinel`. It has only one instance, so that `sentinel` could be
+    compared by identity, even after being unpickled.
+    '''
+
+    _instance: Optional["_SentinelClass"] = None
+
+    def __new__(cls) -> "_SentinelClass":
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
 
 
 sentinel = _SentinelClass()
@@ -33,35 +50,58 @@ class Provider(Generic[VT]):
     of all the implementations.
     '''
 
+    __slots__ = ("_override", "_resolve", "__weakref__")
+
     STATE_FIELDS: Tuple[str, ...] = ("_override",)
 
     def __init__(self) -> None:
         self._override: Union[_SentinelClass, VT] = sentinel
+        self._resolve: Callable[[], VT] = self._provide
 
     def _provide(self) -> VT:
         raise NotImplementedError
 
+    def _inlinable(self) -> bool:
+        '''
+        whether injected functions could hold the value as a plain value, updated
+        through `_inline_into` whenever it changes
+        '''
+        return False
+
+    def _inline_into(self, func: FunctionType, name: str) -> None:
+        '''
+        register a global of `func` holding the value of this provider, so that it
+        could be updated when the value changes
+        '''
+
+    def _update_resolve(self) -> None:
+        if self._override is sentinel:
+            self._resolve = self._provide
+        else:
+            override = cast(VT, self._override)
+            self._resolve = lambda: override
+
     def set(self, value: Union[_SentinelClass, VT]) -> None:
         '''
         set the value to this provider, overriding the original values
         '''
-        if isinstance(value, _SentinelClass):
+        if value is sentinel:
             return
         self._override = value
+        self._update_resolve()
 
     def get(self) -> VT:
         '''
         get the value of this provider
         '''
-        if not isinstance(self._override, _SentinelClass):
-            return self._override
-        return self._provide()
+        return self._resolve()
 
     def reset(self) -> None:
         '''
         remove the overriding and restore the original value
         '''
         self._override = sentinel
+        self._update_resolve()
 
     def __getstate__(self) -> Dict[str, Any]:
         return {f: getattr(self, f) for f in self.STATE_FIELDS}
@@ -69,6 +109,7 @@ class Provider(Generic[VT]):
     def __setstate__(self, state: Dict[str, Any]) -> None:
         for i in self.STATE_FIELDS:
             setattr(self, i, state[i])
+        self._update_resolve()
 
 
 class _ProvideClass:
@@ -87,41 +128,233 @@ Provide = _ProvideClass()
 def _inject_args(
     args: Tuple[Union[Provider[VT], Any], ...]
 ) -> Tuple[Union[VT, Any], ...]:
-    return tuple(a.get() if isinstance(a, Provider) else a for a in args)
+    for a in args:
+        if isinstance(a, Provider):
+            break
+    else:
+        return args
+    return tuple([a.get() if isinstance(a, Provider) else a for a in args])
 
 
 def _inject_kwargs(
     kwargs: Dict[str, Union[Provider[VT], Any]]
 ) -> Dict[str, Union[VT, Any]]:
+    for v in kwargs.values():
+        if isinstance(v, Provider):
+            break
+    else:
+        return kwargs
     return {k: v.get() if isinstance(v, Provider) else v for k, v in kwargs.items()}
 
 
 WrappedCallable = TypeVar("WrappedCallable", bound=Callable[..., Any])
 
 
-def _inject(func: WrappedCallable, squeeze_none: bool) -> WrappedCallable:
-    sig = inspect.signature(func)
-
-    @functools.wraps(func)
-    def _(
-        *args: Optional[Union[Any, _SentinelClass]],
-        **kwargs: Optional[Union[Any, _SentinelClass]]
-    ) -> Any:
-        if not squeeze_none:
-            filtered_args = tuple(a for a in args if not isinstance(a, _SentinelClass))
-            filtered_kwargs = {
-                k: v for k, v in kwargs.items() if not isinstance(v, _SentinelClass)
-            }
-        else:
-            filtered_args = tuple(a for a in args if a is not None)
-            filtered_kwargs = {k: v for k, v in kwargs.items() if v is not None}
+class _Parameters(NamedTuple):
+    '''
+    The parameters of a callable, grouped by how they could be passed. Extracted once
+    so that injecting needs no `inspect` calls afterwards.
+    '''
 
-        bind = sig.bind_partial(*filtered_args, **filtered_kwargs)
-        bind.apply_defaults()
+    positional: Tuple[str, ...]
+    positional_only: int  # the number of leading positional-only parameters
+    var_positional: Optional[str]
+    keyword_only: Tuple[str, ...]
+    var_keyword: Optional[str]
+    defaults: Dict[str, Any]  # shared by the cache, should not be modified
+
+
+def _extract_parameters(func: Callable[..., Any]) -> _Parameters:
+    positional: List[str] = []
+    positional_only = 0
+    var_positional: Optional[str] = None
+    keyword_only: List[str] = []
+    var_keyword: Optional[str] = None
+    defaults: Dict[str, Any] = {}
+    for param in inspect.signature(func).parameters.values():
+        if param.kind is inspect.Parameter.POSITIONAL_ONLY:
+            positional.append(param.name)
+            positional_only += 1
+        elif param.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD:
+            positional.append(param.name)
+        elif param.kind is inspect.Parameter.VAR_POSITIONAL:
+            var_positional = param.name
+        elif param.kind is inspect.Parameter.KEYWORD_ONLY:
+            keyword_only.append(param.name)
+        else:
+            var_keyword = param.name
+        if param.default is not param.empty:
+            defaults[param.name] = param.default
+    return _Parameters(
+        tuple(positional),
+        positional_only,
+        var_positional,
+        tuple(keyword_only),
+        var_keyword,
+        defaults,
+    )
+
+
+def _parameters_inputs(func: Union[FunctionType, MethodType]) -> Tuple[Any, ...]:
+    # what the signature of a function is computed from, all could be reassigned
+    kwdefaults = getattr(func, "__kwdefaults__", None) or {}
+    return (
+        func.__code__,
+        func.__defaults__,
+        getattr(func, "__signature__", None),
+        getattr(func, "__wrapped__", None),
+        *itertools.chain.from_iterable(kwdefaults.items()),
+    )
+
+
+_parameters_cache: """WeakKeyDictionary[
+    Union[FunctionType, MethodType], Tuple[Tuple[Any, ...], _Parameters]
+]""" = WeakKeyDictionary()
+
+
+def _parameters(func: Callable[..., Any]) -> _Parameters:
+    # only functions and methods are cached, weakly keyed so that caching never
+    # keeps them alive, and checked against what their signatures depend on
+    if not isinstance(func, (FunctionType, MethodType)):
+        return _extract_parameters(func)
+    inputs = _parameters_inputs(func)
+    try:
+        cached_inputs, parameters = _parameters_cache[func]
+    except KeyError:
+        pass
+    except TypeError:  # not hashable
+        return _extract_parameters(func)
+    else:
+        if len(cached_inputs) == len(inputs) and all(
+            i is j for i, j in zip(cached_inputs, inputs)
+        ):
+            return parameters
+    parameters = _extract_parameters(func)
+    _parameters_cache[func] = (inputs, parameters)
+    return parameters
 
-        return func(*_inject_args(bind.args), **_inject_kwargs(bind.kwargs))
 
-    return cast(WrappedCallable, _)
+def _inject(func: WrappedCallable, squeeze_none: bool) -> WrappedCallable:
+    parameters = _parameters(func)
+
+    # generate a wrapper with the same parameters as `func`, in which every
+    # default is replaced by a marker of "not passed", and only the arguments
+    # that were not passed are filled with their defaults or resolved providers
+    names = (
+        *parameters.positional,
+        *parameters.keyword_only,
+        parameters.var_positional or "",
+        parameters.var_keyword or "",
+    )
+    prefix = "_di_"
+    while any(name.startswith(prefix) for name in names):
+        prefix = "_" + prefix
+    # builtins are bound to private names too, parameters could shadow them
+    namespace: Dict[str, Any] = {
+        prefix + "func": func,
+        prefix + "tuple": tuple,
+        prefix + "TypeError": TypeError,
+    }
+    # the marker is chosen once here, with `None` compiled in as a constant
+    if squeeze_none:
+        skip_name = "None"
+    else:
+        skip_name = prefix + "skip"
+        namespace[skip_name] = sentinel
+    body: List[str] = []
+    inlined: List[Tuple[Provider[Any], str]] = []
+    func_name = getattr(func, "__name__", type(func).__name__)
+
+    def declare(name: str, arg: str, kind: str) -> str:
+        if name not in parameters.defaults:
+            # the marker never reaches `func`, a required argument is still missing
+            message = f"{func_name}() missing 1 required {kind} argument: '{name}'"
+            body.append(
+                f"    if {arg} is {skip_name}:\n"
+                f"        raise {prefix}TypeError({message!r})"
+            )
+            return arg
+        default = parameters.defaults[name]
+        value = f"{prefix}default{len(body)}"
+        if isinstance(default, Provider):
+            if default._inlinable():
+                # a plain value, which the provider updates when it changes
+                namespace[value] = default.get()
+                inlined.append((default, value))
+            else:
+                namespace[value] = default.get
+                value += "()"
+        else:
+            namespace[value] = default
+        body.append(f"    if {arg} is {skip_name}:\n        {arg} = {value}")
+        return f"{arg}={skip_name}"
+
+    params: List[str] = []
+    call_args: List[str] = []
+    for i, name in enumerate(parameters.positional):
+        if i < parameters.positional_only and sys.version_info < (3, 8):
+            # without the `/` syntax, only builtins could have positional-only
+            # parameters; a private name at least keeps their own from being used
+            arg = f"{prefix}arg{i}"
+        else:
+            arg = name
+        params.append(declare(name, arg, "positional"))
+        call_args.append(arg)
+        if i + 1 == parameters.positional_only and sys.version_info >= (3, 8):
+            params.append("/")
+    if parameters.var_positional is not None:
+        args = parameters.var_positional
+        params.append(f"*{args}")
+        call_args.append(f"*{args}")
+        a = f"{prefix}a"
+        body.append(
+            f"    if {args}:\n"
+            f"        {args} = {prefix}tuple("
+            f"[{a} for {a} in {args} if {a} is not {skip_name}])"
+        )
+    elif parameters.keyword_only:
+        params.append("*")
+    for name in parameters.keyword_only:
+        params.append(declare(name, name, "keyword-only"))
+        call_args.append(f"{name}={name}")
+    if parameters.var_keyword is not None:
+        kwargs = parameters.var_keyword
+        params.append(f"**{kwargs}")
+        call_args.append(f"**{kwargs}")
+        k, v = f"{prefix}k", f"{prefix}v"
+        body.append(
+            f"    if {kwargs}:\n"
+            f"        {kwargs} = {{{k}: {v} for {k}, {v} in {kwargs}.items()"
+            f" if {v} is not {skip_name}}}"
+        )
+
+    body.append(f"    return {prefix}func({', '.join(call_args)})")
+    # named after `func`, as the code name is used in binding errors before 3.10
+    if (
+        func_name.isidentifier()
+        and not keyword.iskeyword(func_name)
+        and not func_name.startswith(prefix)
+    ):
+        wrapper_name = func_name
+    else:
+        wrapper_name = prefix + "wrapper"
+    source = f"def {wrapper_name}({', '.join(params)}):\n" + "\n".join(body)
+    exec(compile(source, "<simple_di.inject>", "exec"), namespace)
+    wrapper: FunctionType = namespace[wrapper_name]
+    if isinstance(func, FunctionType):
+        # the essentials of `functools.update_wrapper`, without merging `__dict__`
+        wrapper.__module__ = func.__module__
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__annotations__ = func.__annotations__
+        wrapper.__wrapped__ = func  # type: ignore
+    else:
+        functools.update_wrapper(wrapper, func)
+    for provider, name in inlined:
+        provider._inline_into(wrapper, name)
+
+    return cast(WrappedCallable, wrapper)
 
 
 @overload
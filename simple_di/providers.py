@@ -1,7 +1,19 @@
 '''
 Provider implementations
 '''
-from typing import Any, Callable as CallableType, Dict, Optional, Tuple, Union
+import threading
+from types import FunctionType
+from typing import (
+    Any,
+    Callable as CallableType,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+from weakref import WeakKeyDictionary
 
 from simple_di import (
     Provider,
@@ -29,21 +41,49 @@ class Static(Provider[VT]):
     provider that returns static values
     '''
 
+    __slots__ = ("_value", "_inlined")
+
     STATE_FIELDS = Provider.STATE_FIELDS + ('_value',)
 
     def __init__(self, value: VT):
         super().__init__()
         self._value = value
+        # created when first inlined, most providers never are
+        self._inlined: "Optional[WeakKeyDictionary[FunctionType, List[str]]]" = None
 
     def _provide(self) -> VT:
         return self._value
 
+    def _inlinable(self) -> bool:
+        # subclasses may compute the value in `_provide`
+        return type(self) is Static
+
+    def _inline_into(self, func: FunctionType, name: str) -> None:
+        if self._inlined is None:
+            self._inlined = WeakKeyDictionary()
+        self._inlined.setdefault(func, []).append(name)
+
+    def _update_resolve(self) -> None:
+        super()._update_resolve()
+        if self._inlined is None:
+            return
+        value = self._resolve()
+        for func, names in list(self._inlined.items()):
+            for name in names:
+                func.__globals__[name] = value
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._inlined = None
+        super().__setstate__(state)
+
 
 class Callable(Provider[VT]):
     '''
     provider that returns the result of a callable
     '''
 
+    __slots__ = ("_args", "_kwargs", "_func", "_target")
+
     STATE_FIELDS = Provider.STATE_FIELDS + ('_args', "_kwargs", "_func")
 
     def __init__(self, func: CallableType[..., VT], *args: Any, **kwargs: Any) -> None:
@@ -51,34 +91,73 @@ class Callable(Provider[VT]):
         self._args = args
         self._kwargs = kwargs
         self._func: CallableType[..., VT] = func
+        self._target = self._bind(func)
+
+    @staticmethod
+    def _bind(func: CallableType[..., VT]) -> CallableType[..., VT]:
+        # a classmethod stays unbound until the owner class is known
+        if isinstance(func, staticmethod):
+            return inject(func.__func__)
+        return func
+
+    def _call(self) -> VT:
+        return self._target(*_inject_args(self._args), **_inject_kwargs(self._kwargs))
 
     def _provide(self) -> VT:
-        return self._func(*_inject_args(self._args), **_inject_kwargs(self._kwargs))
+        return self._call()
+
+    def __set_name__(self, owner: Any, name: str) -> None:
+        if isinstance(self._target, classmethod):
+            self._target = inject(self._target.__get__(None, owner))
 
     def __get__(self, obj: Any, objtype: Any = None) -> "Callable[VT]":
-        if isinstance(self._func, (classmethod, staticmethod)):
-            self._func = inject(self._func.__get__(obj, objtype))
+        if isinstance(self._target, classmethod):
+            self._target = inject(self._target.__get__(obj, objtype))
         return self
 
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._target = self._bind(self._func)
+
 
 class MemoizedCallable(Callable[VT]):
     '''
     provider that returns the result of a callable, but memorize the returns.
     '''
 
+    __slots__ = ("_cache", "_lock")
+
     STATE_FIELDS = Callable.STATE_FIELDS + ("_cache",)
 
     def __init__(self, func: CallableType[..., VT], *args: Any, **kwargs: Any) -> None:
         super().__init__(func, *args, **kwargs)
         self._cache: Union[_SentinelClass, VT] = sentinel
+        self._lock = threading.RLock()
 
     def _provide(self) -> VT:
-        if not isinstance(self._cache, _SentinelClass):
-            return self._cache
-        value = self._func(*_inject_args(self._args), **_inject_kwargs(self._kwargs))
-        self._cache = value
+        if self._cache is not sentinel:
+            return cast(VT, self._cache)
+        with self._lock:
+            # another thread may have finished while this one was waiting
+            if self._cache is not sentinel:
+                return cast(VT, self._cache)
+            value = self._call()
+            self._cache = value
+            self._update_resolve()
         return value
 
+    def _update_resolve(self) -> None:
+        # once computed, `get` returns the cached value without calling `_provide`
+        if self._override is sentinel and self._cache is not sentinel:
+            value = cast(VT, self._cache)
+            self._resolve = lambda: value
+        else:
+            super()._update_resolve()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._lock = threading.RLock()
+        super().__setstate__(state)
+
 
 Factory = Callable
 SingletonFactory = MemoizedCallable
@@ -89,6 +168,8 @@ class Configuration(Provider[Dict[str, Any]]):
     special provider that reflects the structure of a configuration dictionary.
     '''
 
+    __slots__ = ("_data", "fallback", "_child_cache")
+
     STATE_FIELDS = Provider.STATE_FIELDS + ('_data', "fallback")
 
     def __init__(
@@ -99,15 +180,16 @@ class Configuration(Provider[Dict[str, Any]]):
         super().__init__()
         self._data = data
         self.fallback = fallback
+        self._child_cache: Dict[str, _ConfigurationItem] = {}
 
     def set(self, value: Union[_SentinelClass, Dict[str, Any]]) -> None:
-        if isinstance(value, _SentinelClass):
+        if value is sentinel:
             return
         self._data = value
 
     def get(self) -> Union[Dict[str, Any], Any]:
-        if isinstance(self._data, _SentinelClass):
-            if isinstance(self.fallback, _SentinelClass):
+        if self._data is sentinel:
+            if self.fallback is sentinel:
                 raise ValueError("Configuration Provider not initialized")
             return self.fallback
         return self._data
@@ -116,42 +198,91 @@ class Configuration(Provider[Dict[str, Any]]):
         raise NotImplementedError()
 
     def __getattr__(self, name: str) -> "_ConfigurationItem":
-        if name in ("_data", "_override", "fallback"):
+        if name in ("_data", "_override", "_resolve", "fallback", "_child_cache"):
             raise AttributeError()
-        return _ConfigurationItem(config=self, path=(name,))
+        child = self._child_cache.get(name)
+        if child is None:
+            child = _ConfigurationItem(config=self, path=(name,))
+            self._child_cache[name] = child
+        return child
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._child_cache = {}
 
     def __repr__(self) -> str:
         return f"Configuration(data={self._data}, fallback={self.fallback})"
 
 
+# canonical path tuples, shared by the items of all configurations
+_path_cache: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
 class _ConfigurationItem(Provider[Any]):
 
+    __slots__ = ("_config", "_path", "_child_cache")
+
     STATE_FIELDS = Provider.STATE_FIELDS + ('_config', "_path")
 
     def __init__(self, config: Configuration, path: Tuple[str, ...],) -> None:
         super().__init__()
         self._config = config
-        self._path = path
+        self._path = _path_cache.setdefault(path, path)
+        self._child_cache: Dict[str, _ConfigurationItem] = {}
+        self._update_resolve()
 
     def set(self, value: Any) -> None:
-        if isinstance(value, _SentinelClass):
+        if value is sentinel:
             return
         _cursor = self._config.get()
         for i in self._path[:-1]:
             _next: Union[_SentinelClass, Dict[Any, Any]] = _cursor.get(i, sentinel)
-            if isinstance(_next, _SentinelClass):
+            if _next is sentinel:
                 _next = dict()
                 _cursor[i] = _next
             _cursor = _next
         _cursor[self._path[-1]] = value
 
-    def get(self) -> Any:
-        _cursor = self._config.get()
-        if (
-            not isinstance(self._config.fallback, _SentinelClass)
-            and _cursor is self._config.fallback
-        ):
-            return self._config.fallback
+    def _update_resolve(self) -> None:
+        # specialized getters for the common shallow paths
+        depth = len(self._path)
+        if depth == 1:
+            self._resolve = self._get1
+        elif depth == 2:
+            self._resolve = self._get2
+        elif depth == 3:
+            self._resolve = self._get3
+        else:
+            self._resolve = self._provide
+
+    def _get1(self) -> Any:
+        config = self._config
+        data: Any = config._data
+        if data is sentinel or data is config.fallback:
+            return config.get()
+        return data[self._path[0]]
+
+    def _get2(self) -> Any:
+        config = self._config
+        data: Any = config._data
+        if data is sentinel or data is config.fallback:
+            return config.get()
+        key1, key2 = self._path
+        return data[key1][key2]
+
+    def _get3(self) -> Any:
+        config = self._config
+        data: Any = config._data
+        if data is sentinel or data is config.fallback:
+            return config.get()
+        key1, key2, key3 = self._path
+        return data[key1][key2][key3]
+
+    def _provide(self) -> Any:
+        config = self._config
+        _cursor: Any = config._data
+        if _cursor is sentinel or _cursor is config.fallback:
+            return config.get()
         for i in self._path:
             _cursor = _cursor[i]
         return _cursor
@@ -160,9 +291,18 @@ class _ConfigurationItem(Provider[Any]):
         raise NotImplementedError()
 
     def __getattr__(self, name: str) -> "_ConfigurationItem":
-        if name in ("_config", "_path", "_override"):
+        if name in ("_config", "_path", "_override", "_resolve", "_child_cache"):
             raise AttributeError()
-        return type(self)(config=self._config, path=self._path + (name,))
+        child = self._child_cache.get(name)
+        if child is None:
+            child = type(self)(config=self._config, path=self._path + (name,))
+            self._child_cache[name] = child
+        return child
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._path = _path_cache.setdefault(self._path, self._path)
+        self._child_cache = {}
 
     def __repr__(self) -> str:
         return f"_ConfigurationItem(_config={self._config._data}, _path={self._path})"
@@ -1,10 +1,16 @@
 '''
 common tests
 '''
+import gc
 import random
-from typing import Dict, Optional, Tuple
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import weakref
 
-from simple_di import Container, Provide, Provider, inject
+import pytest
+
+from simple_di import Container, Provide, Provider, inject, skip
 from simple_di.providers import Configuration, Factory, SingletonFactory, Static
 
 
@@ -84,6 +90,100 @@ def test_squeeze_none() -> None:
     assert func2(1) == 1
 
 
+def test_static_subclass() -> None:
+    class Counter(Static[int]):
+        def _provide(self) -> int:
+            self._value += 1
+            return self._value
+
+    counter = Counter(0)
+
+    @inject
+    def func(count: int = Provide[counter]) -> int:
+        return count
+
+    assert func() == 1
+    assert func() == 2  # not inlined
+
+
+def test_inject_positional_only() -> None:
+    injected = inject(divmod)  # divmod(x, y, /)
+
+    assert injected(7, 2) == (3, 1)
+    with pytest.raises(TypeError):
+        injected(x=7, y=2)  # type: ignore
+
+
+def test_inject_callable_lifetime() -> None:
+    class A:
+        def method(self, x: int = 1) -> int:
+            return x
+
+    a = A()
+    ref = weakref.ref(a)
+    assert inject(a.method)() == 1
+    del a
+    gc.collect()
+    assert ref() is None  # not kept alive by injecting
+
+    def func(x: int = 1, *, y: int = 1) -> Tuple[int, int]:
+        return x, y
+
+    assert inject(func)() == (1, 1)
+    func.__defaults__ = (2,)
+    func.__kwdefaults__["y"] = 2  # type: ignore
+    assert inject(func)() == (2, 2)  # not a stale cache
+
+    class Unhashable:
+        def __init__(self) -> None:
+            self.values = [1]
+
+        def __hash__(self) -> int:
+            return hash(self.values)  # raises TypeError, like frozen dataclasses
+
+        def __call__(self, x: int = 1) -> int:
+            return x
+
+    assert inject(Unhashable())() == 1
+
+
+def test_marker_not_passed_through() -> None:
+    class Options(Container):
+        cpu: Provider[int] = Static(2)
+
+    @inject(squeeze_none=True)
+    def func1(a: Optional[int], b: int = Provide[Options.cpu]) -> Tuple[int, int]:
+        return a or 0, b
+
+    with pytest.raises(TypeError):
+        func1(None)
+
+    @inject
+    def func2(a: int, b: int = Provide[Options.cpu]) -> Tuple[int, int]:
+        return a, b
+
+    with pytest.raises(TypeError):
+        func2(skip)  # type: ignore
+
+    @inject
+    def func3(*args: int) -> Tuple[int, ...]:
+        return args
+
+    assert func3(1, skip, 2) == (1, 2)  # type: ignore
+
+    @inject
+    def func5(tuple: int = 1, *args: int, TypeError: int = 2) -> Tuple[int, ...]:
+        return (tuple, *args, TypeError)
+
+    assert func5(1, 2, 3) == (1, 2, 3, 2)
+
+    @inject(squeeze_none=True)
+    def func4(**kwargs: Optional[int]) -> Dict[str, Optional[int]]:
+        return kwargs
+
+    assert func4(x=None, y=1) == {"y": 1}
+
+
 def test_memoized_callable() -> None:
     class Options(Container):
         port = SingletonFactory(lambda: random.randint(1, 65535))
@@ -95,6 +195,33 @@ def test_memoized_callable() -> None:
     first_value = func()
     assert func() == first_value
 
+    Options.port.set(0)
+    assert func() == 0
+
+    Options.port.reset()
+    assert func() == first_value
+
+
+def test_memoized_callable_threads() -> None:
+    calls: List[None] = []
+
+    def create() -> int:
+        calls.append(None)
+        time.sleep(0.01)
+        return len(calls)
+
+    class Options(Container):
+        value = SingletonFactory(create)
+
+    threads = [threading.Thread(target=Options.value.get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert Options.value.get() == 1
+    assert len(calls) == 1
+
 
 def test_config() -> None:
     class Options(Container):
@@ -105,6 +232,7 @@ def test_config() -> None:
         return c
 
     Options.worker_config.set(dict())
+    assert Options.worker_config.b.c is Options.worker_config.b.c
 
     assert func(0) == 0
 
@@ -115,6 +243,23 @@ def test_config() -> None:
     assert func() == 1
 
 
+def test_config_depths() -> None:
+    config = Configuration(dict(a=dict(b=dict(c=dict(d=4)))))
+    assert config.a.get() == dict(b=dict(c=dict(d=4)))
+    assert config.a.b.c.get() == dict(d=4)
+    assert config.a.b.c.d.get() == 4
+
+    fallback = Configuration(fallback=0)
+    assert fallback.a.get() == 0
+    assert fallback.a.b.c.get() == 0
+    assert fallback.a.b.c.d.get() == 0
+
+    uninitialized = Configuration()
+    for item in (uninitialized.a, uninitialized.a.b.c, uninitialized.a.b.c.d):
+        with pytest.raises(ValueError):
+            item.get()
+
+
 def test_config_callable() -> None:
     class Options(Container):
         worker_config = Configuration()
@@ -170,3 +315,40 @@ def test_complex_container() -> None:
     Options.config.set(dict(address="a.com", port=100))
     assert Options.metrics.get() == ("a.com", 100)
     assert Runtime.metrics.get() == ("a.com", 100)
+
+
+def test_inject_signature() -> None:
+    class Options(Container):
+        cpu: Provider[int] = Static(2)
+
+    @inject
+    def func(
+        a: int, b: int = Provide[Options.cpu], *args: int, c: int = Provide[Options.cpu]
+    ) -> Tuple[int, int, Tuple[int, ...], int]:
+        return a, b, args, c
+
+    assert func(1) == (1, 2, (), 2)
+    assert func(1, 3, 4, c=5) == (1, 3, (4,), 5)
+    assert func(a=1, b=3) == (1, 3, (), 2)
+    assert func(1, skip, c=skip) == (1, 2, (), 2)  # type: ignore
+
+    with pytest.raises(TypeError, match=r"\bfunc\(\) missing"):
+        func()  # type: ignore
+
+    Options.cpu.set(3)
+    assert func(1) == (1, 3, (), 3)
+
+    Options.cpu.reset()
+    assert func(1) == (1, 2, (), 2)
+
+
+def test_classmethod_factory() -> None:
+    class Options(Container):
+        cpu: Provider[int] = Static(2)
+
+        @SingletonFactory
+        @classmethod
+        def worker(cls, cpu: int = Provide[cpu]) -> Tuple[str, int]:
+            return (cls.__name__, 2 * cpu + 1)
+
+    assert Options.worker.get() == ("Options", 5)
@@ -4,9 +4,10 @@ state loading & saving tests
 import pickle
 from typing import NoReturn, Tuple
 import uuid
+import weakref
 
 from simple_di import Container, Provide, Provider, inject
-from simple_di.providers import Configuration, Factory, SingletonFactory
+from simple_di.providers import Configuration, Factory, SingletonFactory, Static
 
 
 class NotPicklable:
@@ -41,6 +42,17 @@ def test_config_state() -> None:
     assert value == RestoredOptions.config.b.a.get()  # restore config value
 
 
+def test_provider_state() -> None:
+    static = Static(1)
+    restored = pickle.loads(pickle.dumps(static))
+    assert restored.get() == 1  # the unpickled sentinel is still `sentinel`
+
+
+def test_provider_weakref() -> None:
+    static = Static(1)
+    assert weakref.ref(static)() is static
+
+
 def test_integration() -> None:
     @inject
     def func1(